@@ -4,36 +4,82 @@ Dependency checker for chroma-enhanced OCR functionality.
 Verifies all required packages and OCR engines are available.
 """
 
+import argparse
+import os
+import re
+import shutil
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from importlib import import_module
 
-def check_package(package_name, description=""):
-    """Check if a Python package is available."""
+_BASH_VERSION_RE = re.compile(r'version (\d+)\.(\d+)')
+
+def _import(package_name):
+    """Attempt an import, reporting any failure as False."""
     try:
         import_module(package_name)
-        print(f"✓ {package_name} - {description}")
         return True
-    except ImportError:
-        print(f"✗ {package_name} - {description}")
+    except Exception:
+        # ImportError, but also e.g. importlib's _DeadlockError from concurrent imports
         return False
 
-def check_tesseract():
-    """Check if tesseract binary is available."""
+@lru_cache(maxsize=None)
+def _try_import(package_name):
+    """Import a package once and remember whether it succeeded."""
+    return _import(package_name)
+
+def prefetch_packages(package_names, max_workers=8):
+    """Import packages concurrently so later check_package calls hit the cache."""
+    # Concurrent imports of interdependent packages (e.g. chromadb and numpy) can
+    # fail spuriously with partially initialized modules, so the parallel pass only
+    # warms sys.modules; results are settled by a serial pass that retries failures.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(_import, package_names))
+    return {package_name: _try_import(package_name) for package_name in package_names}
+
+def check_package(package_name, description=""):
+    """Check if a Python package is available."""
+    if _try_import(package_name):
+        print(f"✓ {package_name} - {description}")
+        return True
+    print(f"✗ {package_name} - {description}")
+    return False
+
+@lru_cache(maxsize=1)
+def _tesseract_version():
+    """Run the tesseract binary once, memoizing success or failure as (ok, version_or_error)."""
     try:
         import pytesseract
-        version = pytesseract.get_tesseract_version()
-        print(f"✓ tesseract binary - version {version}")
-        return True
+        return True, pytesseract.get_tesseract_version()
     except Exception as e:
-        print(f"✗ tesseract binary - {e}")
+        return False, e
+
+def check_tesseract():
+    """Check if tesseract binary is available."""
+    if not _try_import("pytesseract"):
+        print("✗ tesseract binary - pytesseract is not installed")
         return False
+    ok, version_or_error = _tesseract_version()
+    if ok:
+        print(f"✓ tesseract binary - version {version_or_error}")
+    else:
+        print(f"✗ tesseract binary - {version_or_error}")
+    return ok
 
 def check_bash_version():
     """Check if Bash version supports wait -n for parallel processing."""
     try:
-        # Try to use the homebrew bash first if available
-        bash_paths = ["/opt/homebrew/bin/bash", "/usr/local/bin/bash", "/bin/bash"]
+        # Try to use the homebrew bash first if available, only forking for binaries that exist
+        bash_paths = [
+            path for path in ("/opt/homebrew/bin/bash", "/usr/local/bin/bash", "/bin/bash")
+            if os.path.isfile(path)
+        ]
+        if not bash_paths:
+            bash_on_path = shutil.which("bash")
+            if bash_on_path:
+                bash_paths = [bash_on_path]
 
         for bash_path in bash_paths:
             try:
@@ -46,8 +92,7 @@ def check_bash_version():
                 if result.returncode == 0:
                     version_line = result.stdout.split('\n')[0]
                     # Extract version number
-                    import re
-                    match = re.search(r'version (\d+)\.(\d+)', version_line)
+                    match = _BASH_VERSION_RE.search(version_line)
                     if match:
                         major = int(match.group(1))
                         minor = int(match.group(2))
@@ -56,7 +101,7 @@ def check_bash_version():
                             print(f"✓ Bash {major}.{minor} at {bash_path} - Supports parallel processing")
                             return True, bash_path, f"{major}.{minor}"
                         else:
-                            if bash_path == "/bin/bash":
+                            if bash_path == bash_paths[-1]:
                                 print(f"✗ Bash {major}.{minor} at {bash_path} - Too old for parallel processing (need 4.3+)")
                                 return False, bash_path, f"{major}.{minor}"
                             # Keep looking for newer versions
@@ -71,33 +116,58 @@ def check_bash_version():
         print(f"✗ Error checking Bash version: {e}")
         return False, "/bin/bash", "error"
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check ChromaDB Enhanced dependencies")
+    parser.add_argument(
+        "--profile",
+        choices=["basic", "full"],
+        default="full",
+        help="basic checks core + OCR packages only; full also checks Bash, ASTChunk and Mistune"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    full = args.profile == "full"
+
     print("🔍 Checking ChromaDB Enhanced Dependencies\n")
 
-    # System dependencies
-    print("System Dependencies:")
-    bash_ok, bash_path, bash_version = check_bash_version()
-
-    # AST chunking for source code
-    print("\nSource Code Processing:")
-    astchunk_ok = check_package("astchunk", "AST-aware source code chunking")
-    if astchunk_ok:
-        # Check tree-sitter parsers
-        check_package("tree_sitter", "Multi-language parsing support")
-        print("  → AST-aware chunking ready for source code!")
-    else:
-        print("  → Install with: pip install .")
+    # Import everything up front in parallel; the checks below only print results
+    packages = ["chromadb", "fitz", "PIL", "packaging", "pytesseract", "easyocr", "numpy"]
+    if full:
+        packages += ["astchunk", "tree_sitter", "mistune"]
+    prefetch_packages(packages)
 
-    # Markdown parsing for documentation
-    print("\nMarkdown Processing:")
-    mistune_ok = check_package("mistune", "Markdown parsing for heading-aware chunking")
-    if mistune_ok:
-        print("  → Heading-aware chunking ready for markdown!")
-    else:
-        print("  → Install with: pip install .")
+    bash_ok = astchunk_ok = mistune_ok = False
+    bash_version = "unknown"
+
+    if full:
+        # System dependencies
+        print("System Dependencies:")
+        bash_ok, bash_path, bash_version = check_bash_version()
+
+        # AST chunking for source code
+        print("\nSource Code Processing:")
+        astchunk_ok = check_package("astchunk", "AST-aware source code chunking")
+        if astchunk_ok:
+            # Check tree-sitter parsers
+            check_package("tree_sitter", "Multi-language parsing support")
+            print("  → AST-aware chunking ready for source code!")
+        else:
+            print("  → Install with: pip install .")
+
+        # Markdown parsing for documentation
+        print("\nMarkdown Processing:")
+        mistune_ok = check_package("mistune", "Markdown parsing for heading-aware chunking")
+        if mistune_ok:
+            print("  → Heading-aware chunking ready for markdown!")
+        else:
+            print("  → Install with: pip install .")
+
+        print()
 
     # Core dependencies
-    print("\nCore Dependencies:")
+    print("Core Dependencies:")
     core_deps = [
         ("chromadb", "ChromaDB vector database"),
         ("fitz", "PyMuPDF for PDF processing"),
@@ -105,7 +175,9 @@ def main():
         ("packaging", "Version checking utilities")
     ]
 
-    core_ok = all(check_package(pkg, desc) for pkg, desc in core_deps)
+    # Check every package (not all()'s short-circuit) so all missing ones are reported
+    core_results = [check_package(pkg, desc) for pkg, desc in core_deps]
+    core_ok = all(core_results)
 
     print("\nOCR Dependencies:")
 
@@ -142,29 +214,30 @@ def main():
         print("❌ Core dependencies missing - run: pip install .")
         return 1
 
-    # Bash version check
-    if not bash_ok:
-        print("⚠️  Bash version too old for parallel processing")
-        print("   Current: Bash {}".format(bash_version))
-        print("   Required: Bash 4.3+ for efficient parallel uploads")
-        print("   Install: brew install bash (macOS)")
-        print("   Note: Script will still work but less efficiently")
-    else:
-        print("✅ Bash {} - Parallel processing ready".format(bash_version))
+    if full:
+        # Bash version check
+        if not bash_ok:
+            print("⚠️  Bash version too old for parallel processing")
+            print("   Current: Bash {}".format(bash_version))
+            print("   Required: Bash 4.3+ for efficient parallel uploads")
+            print("   Install: brew install bash (macOS)")
+            print("   Note: Script will still work but less efficiently")
+        else:
+            print("✅ Bash {} - Parallel processing ready".format(bash_version))
 
-    # AST chunking check
-    if astchunk_ok:
-        print("✅ ASTChunk ready - Source code processing available")
-    else:
-        print("⚠️  ASTChunk missing - Source code will use basic chunking")
-        print("   Install with: pip install .")
+        # AST chunking check
+        if astchunk_ok:
+            print("✅ ASTChunk ready - Source code processing available")
+        else:
+            print("⚠️  ASTChunk missing - Source code will use basic chunking")
+            print("   Install with: pip install .")
 
-    # Markdown parsing check
-    if mistune_ok:
-        print("✅ Mistune ready - Markdown heading-aware chunking available")
-    else:
-        print("⚠️  Mistune missing - Markdown will use basic chunking")
-        print("   Install with: pip install .")
+        # Markdown parsing check
+        if mistune_ok:
+            print("✅ Mistune ready - Markdown heading-aware chunking available")
+        else:
+            print("⚠️  Mistune missing - Markdown will use basic chunking")
+            print("   Install with: pip install .")
 
     # OCR check
     if pytesseract_ok and tesseract_binary_ok:
@@ -181,7 +254,8 @@ def main():
 
     print("\n🚀 Ready to process multiple content types!")
     print("   PDFs: ./upload.sh -i /path/to/pdfs --store pdf -e stella")
-    print("   Code: ./upload.sh -i /path/to/source --store source-code -e stella")
+    if full:
+        print("   Code: ./upload.sh -i /path/to/source --store source-code -e stella")
     print("   Docs: ./upload.sh -i /path/to/docs --store documentation -e stella")
 
     return 0
@@ -1,29 +1,171 @@
 from chromadb import Documents, EmbeddingFunction, Embeddings
-from sentence_transformers import SentenceTransformer
+import json
+import logging
+import numpy as np
 import os
 
-class StellaEmbeddingFunction(EmbeddingFunction[Documents]):
-    def __init__(self):
-        self.model = SentenceTransformer("dunzhang/stella_en_400M_v5", trust_remote_code=True)
+logger = logging.getLogger(__name__)
 
-    def __call__(self, input: Documents) -> Embeddings:
-        return self.model.encode(input).tolist()
+ENCODE_BATCH_SIZE = 64
 
-class ModernBERTEmbeddingFunction(EmbeddingFunction[Documents]):
-    def __init__(self):
-        self.model = SentenceTransformer("answerdotai/ModernBERT-large", trust_remote_code=True)
+PRECISIONS = ("float32", "float16")
 
-    def __call__(self, input: Documents) -> Embeddings:
-        return self.model.encode(input).tolist()
+# Runtime backends: name -> (SentenceTransformer backend, SentenceTransformer model_kwargs).
+# onnx/openvino need sentence-transformers[onnx] / sentence-transformers[openvino].
+# "openvino-8bit" quantizes the model weights at load time; it is independent of precision,
+# which only controls the dtype of the returned vectors.
+BACKENDS = {
+    "torch": ("torch", {}),
+    "onnx": ("onnx", {"provider": "CPUExecutionProvider"}),
+    "openvino": ("openvino", {}),
+    "openvino-8bit": ("openvino", {"load_in_8bit": True}),
+}
+
+# Files needed to load a model from the local cache, per SentenceTransformer backend;
+# shards are fetched in parallel. "*" also matches "/", so weights are pinned to the
+# repo root here and module folders are added from modules.json (see _snapshot_patterns).
+_SNAPSHOT_COMMON = ["*.json", "tokenizer*", "*.txt", "*.model", "*.py"]
+SNAPSHOT_PATTERNS = {
+    "torch": _SNAPSHOT_COMMON + ["model.safetensors", "model-*.safetensors"],
+    "onnx": _SNAPSHOT_COMMON + ["onnx/model.onnx", "onnx/model.onnx_data"],
+    "openvino": _SNAPSHOT_COMMON + ["openvino/openvino_model.*"],
+}
+SNAPSHOT_WORKERS = 8
+
+# Loaded models are shared by every precision of the same (model_id, backend)
+_MODELS = {}
+
+_INSTANCES = {}
+
+def _snapshot_patterns(model_id: str, st_backend: str, cache_dir):
+    """Backend patterns plus the weights of the modules the model actually uses.
+
+    Some repos ship extra module folders (Stella has 2_Dense_256 ... 2_Dense_8192)
+    while modules.json only references one of them.
+    """
+    from huggingface_hub import hf_hub_download
+    from huggingface_hub.utils import EntryNotFoundError
+
+    patterns = list(SNAPSHOT_PATTERNS[st_backend])
+    try:
+        modules_path = hf_hub_download(model_id, "modules.json", cache_dir=cache_dir)
+    except EntryNotFoundError:
+        return patterns
+
+    with open(modules_path) as f:
+        for module in json.load(f):
+            if module.get("path"):
+                patterns.append(f"{module['path']}/*.safetensors")
+    return patterns
+
+def _prefetch_model(model_id: str, st_backend: str):
+    """Warm the HuggingFace cache so SentenceTransformer resolves files locally."""
+    from huggingface_hub import snapshot_download
+    from huggingface_hub.utils import LocalEntryNotFoundError
+
+    cache_dir = os.environ.get("SENTENCE_TRANSFORMERS_HOME")
+    try:
+        # Already cached (e.g. baked into the image): no Hub round trip
+        snapshot_download(model_id, cache_dir=cache_dir, local_files_only=True)
+        return
+    except LocalEntryNotFoundError:
+        pass
+
+    try:
+        snapshot_download(
+            model_id,
+            cache_dir=cache_dir,
+            allow_patterns=_snapshot_patterns(model_id, st_backend, cache_dir),
+            max_workers=SNAPSHOT_WORKERS
+        )
+    except Exception as e:
+        # Best effort only; SentenceTransformer reports the real error if loading fails
+        logger.warning("Parallel prefetch of %s failed, loading normally: %s", model_id, e)
+
+def _load_model(model_id: str, backend: str = "torch", **kwargs):
+    """Load a SentenceTransformer.
+
+    The torch backend runs in half precision on CUDA; elsewhere sentence-transformers
+    picks the device (mps, npu, cpu) and dtype itself. onnx and openvino are CPU
+    runtimes with their own graph optimizations.
+    """
+    # Deferred so importing this module doesn't pull in torch/transformers
+    from sentence_transformers import SentenceTransformer
+
+    st_backend, model_kwargs = BACKENDS[backend]
+    _prefetch_model(model_id, st_backend)
 
-class BGEEmbeddingFunction(EmbeddingFunction[Documents]):
-    def __init__(self):
-        self.model = SentenceTransformer("BAAI/bge-large-en-v1.5")
+    if st_backend != "torch":
+        return SentenceTransformer(model_id, backend=st_backend, model_kwargs=dict(model_kwargs), **kwargs)
+
+    import torch
+
+    if torch.cuda.is_available():
+        return SentenceTransformer(model_id, device="cuda", model_kwargs={"torch_dtype": torch.float16}, **kwargs)
+    return SentenceTransformer(model_id, **kwargs)
+
+def _encode(model, input: Documents, precision: str = "float32") -> Embeddings:
+    # Chroma accepts a list of 1-D numpy arrays, so skip the per-float .tolist() boxing
+    embeddings = model.encode(
+        input,
+        batch_size=ENCODE_BATCH_SIZE,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    )
+    # CUDA models run in FP16, so float32 has to be requested explicitly too
+    if precision == "float16":
+        embeddings = embeddings.astype(np.float16, copy=False)
+    else:
+        embeddings = embeddings.astype(np.float32, copy=False)
+    return list(embeddings)
+
+class _SentenceTransformerBase:
+    """Shared implementation for SentenceTransformer-backed embedding functions.
+
+    Deliberately not an EmbeddingFunction itself: Chroma's __init_subclass__ wraps
+    __call__ with validation, so only the concrete classes below subclass it.
+
+    precision controls the dtype of the returned vectors:
+
+    - "float32": full precision, valid with every Chroma distance (l2, ip, cosine).
+    - "float16": half the size, valid with every Chroma distance.
+
+    Never mix precisions within one collection.
+
+    backend selects the runtime: "torch" (default), or for CPU-only hosts
+    "onnx", "openvino" or "openvino-8bit" (8-bit weights, any precision).
+    """
+
+    model_id = None
+    load_kwargs = {}
+
+    def __init__(self, precision: str = "float32", backend: str = "torch"):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision}. Available: {list(PRECISIONS)}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}. Available: {list(BACKENDS.keys())}")
+        self.precision = precision
+        self.backend = backend
+        key = (self.model_id, backend)
+        if key not in _MODELS:
+            _MODELS[key] = _load_model(self.model_id, backend, **self.load_kwargs)
+        self.model = _MODELS[key]
 
     def __call__(self, input: Documents) -> Embeddings:
-        return self.model.encode(input).tolist()
+        return _encode(self.model, input, self.precision)
+
+class StellaEmbeddingFunction(_SentenceTransformerBase, EmbeddingFunction[Documents]):
+    model_id = "dunzhang/stella_en_400M_v5"
+    load_kwargs = {"trust_remote_code": True}
 
-def get_embedding_function(model_name: str):
+class ModernBERTEmbeddingFunction(_SentenceTransformerBase, EmbeddingFunction[Documents]):
+    model_id = "answerdotai/ModernBERT-large"
+    load_kwargs = {"trust_remote_code": True}
+
+class BGEEmbeddingFunction(_SentenceTransformerBase, EmbeddingFunction[Documents]):
+    model_id = "BAAI/bge-large-en-v1.5"
+
+def get_embedding_function(model_name: str, precision: str = "float32", backend: str = "torch"):
     model_map = {
         "stella": StellaEmbeddingFunction,
         "modernbert": ModernBERTEmbeddingFunction,
@@ -33,4 +175,8 @@ def get_embedding_function(model_name: str):
     if model_name not in model_map:
         raise ValueError(f"Unknown embedding model: {model_name}. Available: {list(model_map.keys())}")
 
-    return model_map[model_name]()
\ No newline at end of file
+    key = (model_name, precision, backend)
+    if key not in _INSTANCES:
+        _INSTANCES[key] = model_map[model_name](precision=precision, backend=backend)
+
+    return _INSTANCES[key]
@@ -0,0 +1,31 @@
+import sys
+import types
+
+import check_deps
+
+
+def test_try_import_reports_broken_package_without_raising(tmp_path, monkeypatch):
+    (tmp_path / "broken_pkg_for_check_deps.py").write_text("raise RuntimeError('boom')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    results = check_deps.prefetch_packages(["broken_pkg_for_check_deps", "json"])
+
+    assert results == {"broken_pkg_for_check_deps": False, "json": True}
+
+
+def test_tesseract_failure_is_memoized(monkeypatch):
+    calls = []
+
+    def get_tesseract_version():
+        calls.append(1)
+        raise OSError("tesseract is not installed")
+
+    monkeypatch.setitem(sys.modules, "pytesseract", types.SimpleNamespace(get_tesseract_version=get_tesseract_version))
+    monkeypatch.setattr(check_deps, "_try_import", lambda package_name: True)
+    check_deps._tesseract_version.cache_clear()
+
+    assert check_deps.check_tesseract() is False
+    assert check_deps.check_tesseract() is False
+    assert len(calls) == 1
+
+    check_deps._tesseract_version.cache_clear()
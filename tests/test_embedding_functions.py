@@ -0,0 +1,157 @@
+import json
+import logging
+
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+
+import embedding_functions
+
+
+class FakeModel:
+    def __init__(self, dtype=np.float32):
+        self.dtype = dtype
+
+    def encode(self, input, **kwargs):
+        return np.arange(len(input) * 4, dtype=self.dtype).reshape(len(input), 4) + 1
+
+
+@pytest.fixture
+def fake_load_model(monkeypatch):
+    loads = []
+
+    def load_model(*args, **kwargs):
+        loads.append(args)
+        return FakeModel()
+
+    monkeypatch.setattr(embedding_functions, "_load_model", load_model)
+    monkeypatch.setattr(embedding_functions, "_MODELS", {})
+    monkeypatch.setattr(embedding_functions, "_INSTANCES", {})
+    return loads
+
+
+def test_int8_precision_is_rejected():
+    with pytest.raises(ValueError, match="Unknown precision"):
+        embedding_functions.get_embedding_function("bge-large", precision="int8")
+
+
+@pytest.mark.parametrize("precision", ["float32", "float16"])
+def test_single_string_embedding_is_finite(fake_load_model, precision):
+    ef = embedding_functions.BGEEmbeddingFunction(precision=precision)
+
+    embeddings = ef(["a single query"])
+
+    assert len(embeddings) == 1
+    assert embeddings[0].dtype == np.dtype(precision)
+    assert np.all(np.isfinite(embeddings[0]))
+
+
+def test_precisions_share_one_loaded_model(fake_load_model):
+    ef32 = embedding_functions.get_embedding_function("bge-large", precision="float32")
+    ef16 = embedding_functions.get_embedding_function("bge-large", precision="float16")
+
+    assert ef32 is not ef16
+    assert ef32.model is ef16.model
+    assert len(fake_load_model) == 1
+
+
+def test_float32_precision_upcasts_half_precision_model_output(monkeypatch):
+    monkeypatch.setattr(embedding_functions, "_load_model", lambda *args, **kwargs: FakeModel(np.float16))
+    monkeypatch.setattr(embedding_functions, "_MODELS", {})
+
+    ef = embedding_functions.BGEEmbeddingFunction(precision="float32")
+
+    assert ef(["query"])[0].dtype == np.float32
+
+
+def test_chroma_validation_runs_once_per_call(fake_load_model, monkeypatch):
+    import chromadb.api.types as chroma_types
+
+    calls = []
+    validate = chroma_types.validate_embeddings
+
+    def counting_validate(embeddings):
+        calls.append(embeddings)
+        return validate(embeddings)
+
+    monkeypatch.setattr(chroma_types, "validate_embeddings", counting_validate)
+
+    embedding_functions.BGEEmbeddingFunction()(["query"])
+
+    assert len(calls) == 1
+
+
+class FakeHub:
+    """Records snapshot_download calls; the first (local_files_only) call hits or misses the cache."""
+
+    def __init__(self, tmp_path, cached=False, download_error=None):
+        self.tmp_path = tmp_path
+        self.cached = cached
+        self.download_error = download_error
+        self.calls = []
+
+    def snapshot_download(self, repo_id, **kwargs):
+        from huggingface_hub.utils import LocalEntryNotFoundError
+
+        self.calls.append(kwargs)
+        if kwargs.get("local_files_only"):
+            if self.cached:
+                return str(self.tmp_path)
+            raise LocalEntryNotFoundError("not cached")
+        if self.download_error:
+            raise self.download_error
+        return str(self.tmp_path)
+
+    def hf_hub_download(self, repo_id, filename, **kwargs):
+        path = self.tmp_path / filename
+        path.write_text(json.dumps([
+            {"idx": 0, "name": "0", "path": "", "type": "sentence_transformers.models.Transformer"},
+            {"idx": 1, "name": "1", "path": "1_Pooling", "type": "sentence_transformers.models.Pooling"},
+            {"idx": 2, "name": "2", "path": "2_Dense_1024", "type": "sentence_transformers.models.Dense"},
+        ]))
+        return str(path)
+
+
+@pytest.fixture
+def fake_hub(tmp_path, monkeypatch):
+    huggingface_hub = pytest.importorskip("huggingface_hub")
+
+    def install(**kwargs):
+        hub = FakeHub(tmp_path, **kwargs)
+        monkeypatch.setattr(huggingface_hub, "snapshot_download", hub.snapshot_download)
+        monkeypatch.setattr(huggingface_hub, "hf_hub_download", hub.hf_hub_download)
+        return hub
+
+    return install
+
+
+def test_prefetch_skips_download_when_cached(fake_hub):
+    hub = fake_hub(cached=True)
+
+    embedding_functions._prefetch_model("dunzhang/stella_en_400M_v5", "torch")
+
+    assert len(hub.calls) == 1
+    assert hub.calls[0]["local_files_only"] is True
+
+
+def test_prefetch_downloads_root_and_used_module_weights_when_cold(fake_hub):
+    hub = fake_hub()
+
+    embedding_functions._prefetch_model("dunzhang/stella_en_400M_v5", "torch")
+
+    assert len(hub.calls) == 2
+    patterns = hub.calls[1]["allow_patterns"]
+    assert "model.safetensors" in patterns
+    assert "2_Dense_1024/*.safetensors" in patterns
+    assert "*.safetensors" not in patterns
+    assert hub.calls[1]["max_workers"] == embedding_functions.SNAPSHOT_WORKERS
+
+
+def test_prefetch_logs_warning_when_download_fails(fake_hub, caplog):
+    fake_hub(download_error=OSError("connection refused"))
+
+    with caplog.at_level(logging.WARNING, logger="embedding_functions"):
+        embedding_functions._prefetch_model("BAAI/bge-large-en-v1.5", "torch")
+
+    assert "connection refused" in caplog.text